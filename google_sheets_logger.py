@@ -1,8 +1,15 @@
-import gspread
+# gspread (and the google-auth/requests stack under it) is imported inside the
+# functions that talk to Sheets, so importing this module stays cheap.
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 from datetime import datetime
 import os
 import logging
 import re
+import threading
+import atexit
+import time
+import queue
+import argparse
 
 # Configure logging
 logging.basicConfig(
@@ -11,7 +18,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-print("[OK] Libraries imported successfully")
+logger.debug("Libraries imported successfully")
 
 # The path to your service account credentials file
 CREDENTIALS_FILE = 'credentials.json' 
@@ -22,19 +29,43 @@ SHEET_NAME = 'Spinach Monitor'
 # The worksheet name (tab) to use
 WORKSHEET_NAME = 'Sheet1'
 
-print("[OK] Configuration loaded:")
-print(f"  - Credentials file: {CREDENTIALS_FILE}")
-print(f"  - Sheet name: {SHEET_NAME}")
-print(f"  - Worksheet: {WORKSHEET_NAME}")
+# Rows are buffered locally and written in one append_rows call
+BATCH_SIZE = 20          # Flush as soon as this many rows are pending
+FLUSH_INTERVAL = 30      # Otherwise flush at most this many seconds after the first pending row
+QUEUE_SIZE = 10000       # Rows that can wait for the writer thread before log_data() starts refusing
+PENDING_LIMIT = 1000     # Rows held for retry while the sheet is failing; after that new rows stay in the queue
+FLUSH_TIMEOUT = 15       # At exit, give up on rows not written after this many seconds
+
+# How long rows read from the sheet are reused before fetching again (seconds)
+CACHE_TTL = 30
+
+# Header row written to a new sheet
+HEADERS = [
+    "Timestamp",
+    "Date",
+    "Time", 
+    "Stem Length (mm)",
+    "Avg Leaf Width (mm)",
+    "Largest Leaf (mm)",
+    "Leaf Count",
+    "Total Leaf Area (mm^2)",
+    "Image Filename",
+    "Notes"
+]
+
+logger.debug(f"Configuration loaded: credentials={CREDENTIALS_FILE}, sheet={SHEET_NAME}, worksheet={WORKSHEET_NAME}")
 
 class GoogleSheetsLogger:
     """
     A class to handle Google Sheets logging with connection pooling and error handling.
     """
     
-    def __init__(self, credentials_file=CREDENTIALS_FILE, sheet_name=SHEET_NAME, worksheet_name=WORKSHEET_NAME):
+    def __init__(self, credentials_file=CREDENTIALS_FILE, sheet_name=SHEET_NAME, worksheet_name=WORKSHEET_NAME, connect=True):
         """
         Initialize the logger with credentials and sheet information.
+        
+        With connect=False no network I/O happens here; the connection is
+        made on first use (the first flush or read).
         """
         self.credentials_file = credentials_file
         self.sheet_name = sheet_name
@@ -42,19 +73,57 @@ class GoogleSheetsLogger:
         self.gc = None
         self.spreadsheet = None
         self.worksheet = None
+        self._append_range = None
+        
+        # Rows queued by log_data() for the background writer thread
+        self._q = queue.Queue(maxsize=QUEUE_SIZE)
+        
+        # Rows taken off the queue and waiting to be written by flush()
+        self._pending_rows = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        
+        # Most recent row passed to log_data() that isn't known to be in the sheet yet
+        self._last_row = None
+        
+        # Set by close() so the writer stops even while it is holding off the queue
+        self._closed = threading.Event()
+        
+        # Rows flush() has taken out of the buffer and is currently writing
+        self._in_flight = 0
+        
+        # Last (headers, rows) read from the sheet, reused for CACHE_TTL seconds
+        self._cache = None
+        self._cache_ts = 0
+        self._cache_ttl = CACHE_TTL
+        
+        # Try to connect immediately unless asked to wait for first use
+        if connect:
+            self._connect()
+        
+        # Background thread that batches queued rows into the sheet
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
         
-        # Try to connect immediately
-        self._connect()
+        # Make sure buffered rows are written when the program exits
+        # (bounded, so a stalled connection can't hang interpreter exit)
+        atexit.register(self.close, FLUSH_TIMEOUT)
     
     def _connect(self):
         """
         Establish connection to Google Sheets.
         """
+        import gspread
+        from google.auth import exceptions as google_auth_exceptions
+        
         try:
             logger.info(f"Connecting to Google Sheet: {self.sheet_name}...")
             
-            # Authenticate with Google Sheets
-            self.gc = gspread.service_account(filename=self.credentials_file)
+            # Authenticate with Google Sheets (the client is kept across
+            # reconnects and only recreated after an auth error)
+            if self.gc is None:
+                self.gc = gspread.service_account(filename=self.credentials_file)
+                self._tune_session()
             
             # Open the spreadsheet
             self.spreadsheet = self.gc.open(self.sheet_name)
@@ -70,6 +139,10 @@ class GoogleSheetsLogger:
                     cols=10
                 )
             
+            # Explicit A1 range for values.append (quotes doubled per A1 notation)
+            quoted_name = self.worksheet_name.replace("'", "''")
+            self._append_range = f"'{quoted_name}'!A:J"
+            
             # Initialize headers if needed
             self._initialize_headers()
             
@@ -87,32 +160,54 @@ class GoogleSheetsLogger:
             logger.error("Please download it from Google Cloud Console and place it in the same directory.")
             return False
             
-        except Exception as e:
+        except google_auth_exceptions.GoogleAuthError as e:
             logger.error(f"Error during Google Sheets authentication: {e}")
+            # Credentials are bad or expired, authenticate again next time
+            self.gc = None
+            return False
+            
+        except Exception as e:
+            logger.error(f"Error connecting to Google Sheets: {e}")
             return False
     
+    def _tune_session(self):
+        """
+        Mount a pooled HTTPS adapter on the client's authorized session so
+        TCP/TLS connections are kept alive and reused between API calls.
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        # gspread 6 keeps the session on http_client, older versions on the client
+        http_client = getattr(self.gc, "http_client", self.gc)
+        session = getattr(http_client, "session", None)
+        if session is None:
+            return
+        
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=1)
+        )
+        session.mount("https://", adapter)
+    
     def _initialize_headers(self):
         """
         Check if headers exist, if not, add them.
+        
+        A marker file per spreadsheet/worksheet id remembers that the headers are in
+        place, so later connects skip the A1 read entirely.
         """
         try:
+            marker = os.path.expanduser(f"~/.spinach_hdr_{self.spreadsheet.id}_{self.worksheet.id}")
+            if os.path.exists(marker):
+                return
+            
             first_cell = self.worksheet.acell('A1').value
             
             if not first_cell:
                 logger.info("Adding header row to sheet...")
-                headers = [
-                    "Timestamp",
-                    "Date",
-                    "Time", 
-                    "Stem Length (mm)",
-                    "Avg Leaf Width (mm)",
-                    "Largest Leaf (mm)",
-                    "Leaf Count",
-                    "Total Leaf Area (mm^2)",
-                    "Image Filename",
-                    "Notes"
-                ]
-                self.worksheet.append_row(headers)
+                self.worksheet.append_row(HEADERS)
                 
                 # Format header row (bold)
                 self.worksheet.format('A1:J1', {
@@ -121,29 +216,39 @@ class GoogleSheetsLogger:
                 })
                 
                 logger.info("[OK] Headers added successfully")
+            
+            # Remember that this sheet already has its headers
+            open(marker, 'w').close()
                 
         except Exception as e:
             logger.warning(f"Could not initialize headers: {e}")
 
-print("[OK] GoogleSheetsLogger class initialized")
+logger.debug("GoogleSheetsLogger class initialized")
+
+# Matches the number in "Total area: X.XXmm^2"
+_TOTAL_AREA_RE = re.compile(r'Total area:\s*([\d.]+)mm')
 
 def extract_total_area(notes):
     """
     Extract total leaf area from notes string.
     Expected format: "Total area: 123.45mm^2 [Every X]"
     """
-    if not notes:
+    # Cheap substring check before running the regex
+    if not notes or "Total area:" not in notes:
         return ""
     
-    # Extract number from "Total area: X.XXmm^2"
-    match = re.search(r'Total area: ([\d.]+)mm', notes)
+    match = _TOTAL_AREA_RE.search(notes)
     if match:
         return round(float(match.group(1)), 2)
     return ""
 
 def log_data_method(self, stem_mm, leaf_mm, image_filename, largest_leaf_mm=None, leaf_count=None, notes=""):
     """
-    Logs the measured data to Google Sheet.
+    Queues the measured data for the Google Sheet.
+    
+    This never waits on the network: a background writer thread batches
+    queued rows and writes them once BATCH_SIZE rows are pending or
+    FLUSH_INTERVAL seconds after the first one.
     
     Args:
         stem_mm: Stem length in millimeters
@@ -154,21 +259,14 @@ def log_data_method(self, stem_mm, leaf_mm, image_filename, largest_leaf_mm=None
         notes: Any additional notes (optional)
     
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if the row was queued, False otherwise
     """
-    logger.info(f"Logging data to Google Sheet: {self.sheet_name}...")
-    
-    # Try to reconnect if connection was lost
-    if not self.worksheet:
-        if not self._connect():
-            return False
-    
     try:
-        # Prepare timestamp data
-        now = datetime.now()
-        timestamp_iso = now.isoformat()
-        date_str = now.strftime("%Y-%m-%d")
-        time_str = now.strftime("%H:%M:%S")
+        # Prepare timestamp data (date and time are slices of the ISO string,
+        # which avoids two strftime calls per row)
+        timestamp_iso = datetime.now().isoformat()
+        date_str = timestamp_iso[:10]
+        time_str = timestamp_iso[11:19]
         
         # Prepare the new row with all data
         new_row = [
@@ -184,74 +282,357 @@ def log_data_method(self, stem_mm, leaf_mm, image_filename, largest_leaf_mm=None
             notes
         ]
         
-        # Append the data
-        self.worksheet.append_row(new_row)
+    except Exception as e:
+        logger.error(f"Error preparing row for sheet: {e}")
+        return False
+    
+    try:
+        self._q.put_nowait(new_row)
+    except queue.Full:
+        logger.error("Log queue is full, dropping row. Is the sheet reachable?")
+        return False
+    
+    with self._pending_lock:
+        self._last_row = new_row
+    
+    logger.info(f"Queued row for Google Sheet ({self._q.qsize()} queued)")
+    logger.info(f"  Row data: Stem={stem_mm:.2f}mm, Leaf={leaf_mm:.2f}mm")
+    if largest_leaf_mm:
+        logger.info(f"  Largest Leaf={largest_leaf_mm:.2f}mm, Count={leaf_count}")
+    
+    return True
+
+def _writer_loop_method(self):
+    """
+    Background thread: move queued rows into the pending buffer and flush
+    it when it is full or FLUSH_INTERVAL has passed. A None on the queue
+    stops the thread after a final flush.
+    """
+    deadline = None
+    backoff = False
+    
+    while True:
+        with self._pending_lock:
+            pending = len(self._pending_rows)
         
-        logger.info("[OK] Successfully logged data to Google Sheet")
-        logger.info(f"  Row data: Stem={stem_mm:.2f}mm, Leaf={leaf_mm:.2f}mm")
-        if largest_leaf_mm:
-            logger.info(f"  Largest Leaf={largest_leaf_mm:.2f}mm, Count={leaf_count}")
+        if pending and deadline is None:
+            deadline = time.monotonic() + FLUSH_INTERVAL
         
-        return True
+        due = deadline is not None and time.monotonic() >= deadline
+        if due or (pending >= BATCH_SIZE and not backoff):
+            if self.flush():
+                deadline, backoff = None, False
+            else:
+                # Leave the rows pending and wait a full interval before retrying
+                deadline, backoff = time.monotonic() + FLUSH_INTERVAL, True
+            continue
         
-    except gspread.exceptions.APIError as e:
-        logger.error(f"Google Sheets API error: {e}")
-        logger.error("This might be a quota limit or permission issue.")
-        return False
+        if pending >= PENDING_LIMIT:
+            # The buffer is full and the sheet keeps failing: stop taking rows,
+            # so the bounded queue fills up and log_data() starts refusing
+            if self._closed.wait(max(0, deadline - time.monotonic())):
+                self.flush()
+                return
+            continue
         
-    except Exception as e:
-        logger.error(f"Error appending data to sheet: {e}")
-        # Try to reconnect for next time
-        self.worksheet = None
+        timeout = None if deadline is None else max(0, deadline - time.monotonic())
+        try:
+            row = self._q.get(timeout=timeout)
+        except queue.Empty:
+            continue
+        
+        if row is None:
+            self.flush()
+            return
+        
+        with self._pending_lock:
+            self._pending_rows.append(row)
+
+def flush_method(self):
+    """
+    Writes all buffered and queued rows to the Google Sheet in a single API call.
+    
+    On failure the rows are put back at the front of the buffer so the
+    next flush retries them.
+    
+    Returns:
+        bool: True if successful (or nothing to write), False otherwise
+    """
+    import gspread
+    from google.auth import exceptions as google_auth_exceptions
+    
+    with self._write_lock:
+        # Atomically take the current buffer plus anything still queued
+        stop_requested = False
+        with self._pending_lock:
+            batch, self._pending_rows = self._pending_rows, []
+            while len(batch) < PENDING_LIMIT:
+                try:
+                    row = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop_requested = True
+                else:
+                    batch.append(row)
+            self._in_flight = len(batch)
+        
+        # Hand the stop request back to the writer thread
+        if stop_requested:
+            self._q.put(None)
+        
+        if not batch:
+            return True
+        
+        logger.info(f"Logging {len(batch)} row(s) to Google Sheet: {self.sheet_name}...")
+        
+        try:
+            # Try to reconnect if connection was lost
+            if not self.worksheet:
+                if not self._connect():
+                    self._requeue_rows(batch)
+                    return False
+            
+            # Append the whole batch at once
+            self._do_append_rows(batch)
+            
+            # Cached rows no longer match the sheet
+            self._cache = None
+            with self._pending_lock:
+                self._in_flight = 0
+                if self._last_row is batch[-1]:
+                    self._last_row = None
+            
+            logger.info(f"[OK] Successfully logged {len(batch)} row(s) to Google Sheet")
+            return True
+            
+        except gspread.exceptions.APIError as e:
+            logger.error(f"Google Sheets API error: {e}")
+            logger.error("This might be a quota limit or permission issue.")
+            self._requeue_rows(batch)
+            return False
+            
+        except google_auth_exceptions.GoogleAuthError as e:
+            logger.error(f"Authentication error while appending to sheet: {e}")
+            # Authenticate again on the next attempt
+            self.gc = None
+            self.spreadsheet = None
+            self.worksheet = None
+            self._requeue_rows(batch)
+            return False
+            
+        except Exception as e:
+            logger.error(f"Error appending data to sheet: {e}")
+            # Try to reconnect for next time, reusing the authenticated client
+            self.spreadsheet = None
+            self.worksheet = None
+            self._requeue_rows(batch)
+            return False
+
+def _requeue_rows_method(self, rows):
+    """
+    Put rows that failed to write back at the front of the buffer.
+    """
+    with self._pending_lock:
+        self._pending_rows[:0] = rows
+        self._in_flight = 0
+
+def close_method(self, timeout=None):
+    """
+    Stop the writer thread after it has written everything still queued.
+    
+    With a timeout, gives up waiting after that many seconds and logs how
+    many rows were never written.
+    """
+    stop_marker = 0
+    if self._writer.is_alive():
+        self._closed.set()
+        try:
+            self._q.put_nowait(None)
+            stop_marker = 1
+        except queue.Full:
+            pass # The writer is holding off the full queue and will see _closed
+        self._writer.join(timeout)
+    
+    if self._writer.is_alive():
+        with self._pending_lock:
+            abandoned = len(self._pending_rows) + self._in_flight + max(0, self._q.qsize() - stop_marker)
+        logger.error(f"Gave up waiting for the sheet after {timeout}s; {abandoned} row(s) were not written")
+
+# HTTP status codes from the Sheets API that are worth retrying
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+
+def _is_transient_error(e):
+    """
+    True for rate-limit and server-side Sheets API errors.
+    """
+    import gspread
+    
+    if not isinstance(e, gspread.exceptions.APIError):
         return False
+    response = getattr(e, "response", None)
+    return getattr(response, "status_code", None) in TRANSIENT_STATUS_CODES
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=1, min=2, max=60),
+    retry=retry_if_exception(_is_transient_error),
+    reraise=True
+)
+def _do_append_rows_method(self, rows):
+    """
+    Append rows to the worksheet, retrying transient API errors with
+    exponential backoff (2-60s, 5 attempts).
+    
+    Calls the Sheets values.append endpoint directly with the fixed A:J
+    range, skipping the extra work gspread's append_rows does per call.
+    """
+    self.spreadsheet.values_append(
+        self._append_range,
+        params={"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+        body={"values": rows}
+    )
 
 # Add the method to the class
 GoogleSheetsLogger.log_data = log_data_method
+GoogleSheetsLogger.flush = flush_method
+GoogleSheetsLogger.close = close_method
+GoogleSheetsLogger._writer_loop = _writer_loop_method
+GoogleSheetsLogger._requeue_rows = _requeue_rows_method
+GoogleSheetsLogger._do_append_rows = _do_append_rows_method
 
-print("[OK] log_data() method added to GoogleSheetsLogger")
+logger.debug("log_data(), flush() and close() methods added to GoogleSheetsLogger")
 
 
-def get_all_data_method(self):
+# Column positions in the sheet (see _initialize_headers)
+DATE_COL = 1
+STEM_COL = 3
+LEAF_COL = 4
+AREA_COL = 7
+
+def _cell_float(row, col):
     """
-    Retrieve all data from the sheet.
+    Parse a numeric cell from a get_all_values() row.
+    Returns None for missing, empty or non-numeric cells.
+    """
+    if col >= len(row) or not row[col]:
+        return None
+    try:
+        return float(row[col])
+    except ValueError:
+        return None
+
+def get_all_rows_method(self):
+    """
+    Retrieve all rows from the sheet as plain lists of cell values.
+    
+    The result is cached for CACHE_TTL seconds and dropped whenever new
+    rows are written, so repeated reads don't download the sheet again.
     
     Returns:
-        list: All rows from the sheet, or None if error
+        tuple: (headers, rows) where rows excludes the header row, or None if error
     """
+    if self._cache is not None and time.monotonic() - self._cache_ts < self._cache_ttl:
+        return self._cache
+    
     try:
         if not self.worksheet:
             if not self._connect():
                 return None
         
-        data = self.worksheet.get_all_records()
-        logger.info(f"Retrieved {len(data)} rows from Google Sheet")
-        return data
+        values = self.worksheet.get_all_values()
+        if not values:
+            return [], []
+        
+        headers, rows = values[0], values[1:]
+        logger.info(f"Retrieved {len(rows)} rows from Google Sheet")
+        
+        self._cache = (headers, rows)
+        self._cache_ts = time.monotonic()
+        return self._cache
         
     except Exception as e:
         logger.error(f"Error retrieving data: {e}")
         return None
 
+def _record(headers, values):
+    """
+    Build a dict for one row the way get_all_records() does, converting
+    numeric strings to int/float ("45.5" -> 45.5) and leaving the rest alone.
+    """
+    from gspread.utils import numericise_all
+    
+    return dict(zip(headers, numericise_all([str(v) for v in values])))
+
+def get_all_data_method(self):
+    """
+    Retrieve all data from the sheet.
+    
+    Kept for callers that expect one dict per row, with the same value
+    types get_all_records() returns; internal code uses get_all_rows()
+    and indexes columns directly.
+    
+    Returns:
+        list: All rows from the sheet as dicts keyed by header, or None if error
+    """
+    result = self.get_all_rows()
+    if result is None:
+        return None
+    
+    headers, rows = result
+    return [_record(headers, row) for row in rows]
+
 def get_latest_measurement_method(self):
     """
     Get the most recent measurement from the sheet.
     
+    Rows still waiting to be flushed are newer than anything in the
+    sheet, so the last of those is returned without a network call
+    (converted the same way as rows read back from the sheet).
+    
     Returns:
         dict: Latest measurement data, or None if error
     """
+    with self._pending_lock:
+        if self._last_row is not None:
+            return _record(HEADERS, self._last_row)
+    
     try:
-        data = self.get_all_data()
-        if data and len(data) > 0:
-            return data[-1]
+        result = self.get_all_rows()
+        if result and result[1]:
+            headers, rows = result
+            return _record(headers, rows[-1])
         return None
     except Exception as e:
         logger.error(f"Error getting latest measurement: {e}")
         return None
 
 # Add methods to the class
+GoogleSheetsLogger.get_all_rows = get_all_rows_method
 GoogleSheetsLogger.get_all_data = get_all_data_method
 GoogleSheetsLogger.get_latest_measurement = get_latest_measurement_method
 
-print("[OK] Data retrieval methods added to GoogleSheetsLogger")
+logger.debug("Data retrieval methods added to GoogleSheetsLogger")
+
+def _column_array(rows, col):
+    """
+    Parse one numeric column into a float array, dropping empty, zero and
+    non-numeric cells.
+    """
+    import numpy as np
+    
+    values = np.fromiter((_cell_float(row, col) or 0.0 for row in rows), dtype=np.float64, count=len(rows))
+    return values[values != 0]
+
+def _metric_stats(values):
+    """
+    First, last, growth (last - first) and mean of a parsed metric column.
+    """
+    if not len(values):
+        return 0, 0, 0, 0
+    first, last = float(values[0]), float(values[-1])
+    growth = last - first if len(values) > 1 else 0
+    return first, last, growth, float(values.mean())
 
 def get_growth_summary_method(self):
     """
@@ -261,30 +642,38 @@ def get_growth_summary_method(self):
         dict: Summary statistics
     """
     try:
-        data = self.get_all_data()
-        if not data or len(data) == 0:
+        result = self.get_all_rows()
+        if not result or not result[1]:
             return None
         
-        stem_lengths = [row.get('Stem Length (mm)', 0) for row in data if row.get('Stem Length (mm)')]
-        leaf_widths = [row.get('Avg Leaf Width (mm)', 0) for row in data if row.get('Avg Leaf Width (mm)')]
-        total_areas = [row.get('Total Leaf Area (mm^2)', 0) for row in data if row.get('Total Leaf Area (mm^2)')]
+        data = result[1]
+        
+        # Parse each metric column once into a typed array; all the statistics
+        # below are then vectorized operations on those arrays
+        stems = _column_array(data, STEM_COL)
+        leaves = _column_array(data, LEAF_COL)
+        areas = _column_array(data, AREA_COL)
+        
+        stem_first, stem_last, stem_growth, stem_avg = _metric_stats(stems)
+        leaf_first, leaf_last, leaf_growth, leaf_avg = _metric_stats(leaves)
+        area_first, area_last, area_growth, area_avg = _metric_stats(areas)
         
         summary = {
             'total_measurements': len(data),
-            'first_measurement_date': data[0].get('Date', 'Unknown'),
-            'latest_measurement_date': data[-1].get('Date', 'Unknown'),
-            'initial_stem_length': stem_lengths[0] if stem_lengths else 0,
-            'current_stem_length': stem_lengths[-1] if stem_lengths else 0,
-            'stem_growth': stem_lengths[-1] - stem_lengths[0] if len(stem_lengths) > 1 else 0,
-            'initial_leaf_width': leaf_widths[0] if leaf_widths else 0,
-            'current_leaf_width': leaf_widths[-1] if leaf_widths else 0,
-            'leaf_growth': leaf_widths[-1] - leaf_widths[0] if len(leaf_widths) > 1 else 0,
-            'avg_stem_length': sum(stem_lengths) / len(stem_lengths) if stem_lengths else 0,
-            'avg_leaf_width': sum(leaf_widths) / len(leaf_widths) if leaf_widths else 0,
-            'initial_total_area': total_areas[0] if total_areas else 0,
-            'current_total_area': total_areas[-1] if total_areas else 0,
-            'total_area_growth': total_areas[-1] - total_areas[0] if len(total_areas) > 1 else 0,
-            'avg_total_area': sum(total_areas) / len(total_areas) if total_areas else 0,
+            'first_measurement_date': data[0][DATE_COL] if len(data[0]) > DATE_COL else 'Unknown',
+            'latest_measurement_date': data[-1][DATE_COL] if len(data[-1]) > DATE_COL else 'Unknown',
+            'initial_stem_length': stem_first,
+            'current_stem_length': stem_last,
+            'stem_growth': stem_growth,
+            'initial_leaf_width': leaf_first,
+            'current_leaf_width': leaf_last,
+            'leaf_growth': leaf_growth,
+            'avg_stem_length': stem_avg,
+            'avg_leaf_width': leaf_avg,
+            'initial_total_area': area_first,
+            'current_total_area': area_last,
+            'total_area_growth': area_growth,
+            'avg_total_area': area_avg,
         }
         
         return summary
@@ -296,7 +685,7 @@ def get_growth_summary_method(self):
 # Add method to the class
 GoogleSheetsLogger.get_growth_summary = get_growth_summary_method
 
-print("[OK] Growth analysis method added to GoogleSheetsLogger")
+logger.debug("Growth analysis method added to GoogleSheetsLogger")
 
 _logger_instance = None
 
@@ -317,120 +706,169 @@ def log_data(stem_mm, leaf_mm, image_filename, largest_leaf_mm=None, leaf_count=
     logger_obj = get_logger()
     return logger_obj.log_data(stem_mm, leaf_mm, image_filename, largest_leaf_mm, leaf_count, notes)
 
-print("[OK] Global logger instance and helper functions defined")
-print("\nYou can now use:")
-print("  - log_data() - Simple function for logging")
-print("  - get_logger() - Get the logger instance for advanced features")
+logger.debug("Global logger instance and helper functions defined")
 
-# Only run tests if this file is run directly (not imported)
-if __name__ == "__main__":
+def _print_header(title):
     print("\n" + "="*60)
-    print("TESTING GOOGLE SHEETS CONNECTION")
+    print(title)
     print("="*60)
+
+def _cli_test_connect(args):
+    """
+    Connect to the sheet and report whether it worked.
+    """
+    _print_header("TESTING GOOGLE SHEETS CONNECTION")
     
-    # Try to initialize the logger
-    try:
-        test_logger = GoogleSheetsLogger()
+    sheets_logger = GoogleSheetsLogger(connect=False)
+    if sheets_logger._connect():
         print("\n[OK] Logger initialized successfully!")
-        print("\nReady to test logging...")
-    except Exception as e:
-        print(f"\n[ERROR] Error initializing logger: {e}")
-        print("\nPlease check:")
-        print("  1. credentials.json exists in this directory")
-        print("  2. Google Sheet 'Spinach Monitor' is created")
-        print("  3. Sheet is shared with service account email")
+        return 0
     
-    print("\n" + "="*60)
-    print("TESTING DATA LOGGING")
-    print("="*60)
+    print("\n[ERROR] Error initializing logger. Check the errors above.")
+    print("\nPlease check:")
+    print(f"  1. {CREDENTIALS_FILE} exists in this directory")
+    print(f"  2. Google Sheet '{SHEET_NAME}' is created")
+    print("  3. Sheet is shared with service account email")
+    return 1
+
+def _cli_log(args):
+    """
+    Log one row (test values by default) and write it immediately.
+    """
+    _print_header("TESTING DATA LOGGING")
     
-    # Log test data
-    test_success = log_data(
-        stem_mm=45.5,
-        leaf_mm=12.3,
-        image_filename="test_image.jpg",
-        largest_leaf_mm=15.8,
-        leaf_count=6,
-        notes="Total area: 123.45mm^2 [Test]"
+    sheets_logger = get_logger()
+    test_success = sheets_logger.log_data(
+        stem_mm=args.stem,
+        leaf_mm=args.leaf,
+        image_filename=args.image,
+        largest_leaf_mm=args.largest_leaf,
+        leaf_count=args.count,
+        notes=args.notes
     )
     
+    # Write the buffered row now rather than waiting for the writer thread
+    if test_success:
+        test_success = sheets_logger.flush()
+    
     if test_success:
         print("\n[OK] Test data logged successfully!")
         print("Check your Google Sheet to see the new row.")
-    else:
-        print("\n[ERROR] Test logging failed. Check the errors above.")
+        return 0
     
-    print("\n" + "="*60)
-    print("RETRIEVING LATEST MEASUREMENT")
-    print("="*60)
+    print("\n[ERROR] Test logging failed. Check the errors above.")
+    return 1
+
+def _cli_latest(args):
+    """
+    Print the most recent measurement.
+    """
+    _print_header("RETRIEVING LATEST MEASUREMENT")
     
-    sheets_logger = get_logger()
-    latest = sheets_logger.get_latest_measurement()
+    latest = get_logger().get_latest_measurement()
     
     if latest:
         print("\nLatest measurement:")
         for key, value in latest.items():
             print(f"  {key}: {value}")
-    else:
-        print("\nNo measurements found or error occurred.")
+        return 0
     
-    print("\n" + "="*60)
-    print("SPINACH GROWTH SUMMARY")
-    print("="*60)
+    print("\nNo measurements found or error occurred.")
+    return 1
+
+def _cli_summary(args):
+    """
+    Print growth statistics over all measurements.
+    """
+    _print_header("SPINACH GROWTH SUMMARY")
     
-    sheets_logger = get_logger()
-    summary = sheets_logger.get_growth_summary()
-    
-    if summary:
-        print(f"\nMeasurements:")
-        print(f"  Total measurements: {summary['total_measurements']}")
-        print(f"  First measurement: {summary['first_measurement_date']}")
-        print(f"  Latest measurement: {summary['latest_measurement_date']}")
-        
-        print(f"\nStem Growth:")
-        print(f"  Initial: {summary['initial_stem_length']:.2f}mm")
-        print(f"  Current: {summary['current_stem_length']:.2f}mm")
-        print(f"  Total growth: {summary['stem_growth']:.2f}mm")
-        print(f"  Average: {summary['avg_stem_length']:.2f}mm")
-        
-        print(f"\nLeaf Growth:")
-        print(f"  Initial: {summary['initial_leaf_width']:.2f}mm")
-        print(f"  Current: {summary['current_leaf_width']:.2f}mm")
-        print(f"  Total growth: {summary['leaf_growth']:.2f}mm")
-        print(f"  Average: {summary['avg_leaf_width']:.2f}mm")
-        
-        print(f"\nTotal Leaf Area Growth:")
-        print(f"  Initial: {summary['initial_total_area']:.2f}mm^2")
-        print(f"  Current: {summary['current_total_area']:.2f}mm^2")
-        print(f"  Total growth: {summary['total_area_growth']:.2f}mm^2")
-        print(f"  Average: {summary['avg_total_area']:.2f}mm^2")
-        
-        print("\n" + "="*60)
-    else:
+    summary = get_logger().get_growth_summary()
+    
+    if not summary:
         print("\nNo data available for summary or error occurred.")
+        return 1
+    
+    print(f"\nMeasurements:")
+    print(f"  Total measurements: {summary['total_measurements']}")
+    print(f"  First measurement: {summary['first_measurement_date']}")
+    print(f"  Latest measurement: {summary['latest_measurement_date']}")
+    
+    print(f"\nStem Growth:")
+    print(f"  Initial: {summary['initial_stem_length']:.2f}mm")
+    print(f"  Current: {summary['current_stem_length']:.2f}mm")
+    print(f"  Total growth: {summary['stem_growth']:.2f}mm")
+    print(f"  Average: {summary['avg_stem_length']:.2f}mm")
+    
+    print(f"\nLeaf Growth:")
+    print(f"  Initial: {summary['initial_leaf_width']:.2f}mm")
+    print(f"  Current: {summary['current_leaf_width']:.2f}mm")
+    print(f"  Total growth: {summary['leaf_growth']:.2f}mm")
+    print(f"  Average: {summary['avg_leaf_width']:.2f}mm")
+    
+    print(f"\nTotal Leaf Area Growth:")
+    print(f"  Initial: {summary['initial_total_area']:.2f}mm^2")
+    print(f"  Current: {summary['current_total_area']:.2f}mm^2")
+    print(f"  Total growth: {summary['total_area_growth']:.2f}mm^2")
+    print(f"  Average: {summary['avg_total_area']:.2f}mm^2")
     
     print("\n" + "="*60)
-    print("ALL MEASUREMENT DATA")
-    print("="*60)
+    return 0
+
+def _cli_all(args):
+    """
+    Print the first few rows of the sheet.
+    """
+    _print_header("ALL MEASUREMENT DATA")
     
-    sheets_logger = get_logger()
-    all_data = sheets_logger.get_all_data()
-    
-    if all_data:
-        print(f"\nTotal rows: {len(all_data)}\n")
-        
-        # Display first 5 rows
-        print("First 5 measurements:")
-        for i, row in enumerate(all_data[:5], 1):
-            print(f"\n  Measurement {i}:")
-            print(f"    Date: {row.get('Date', 'N/A')}")
-            print(f"    Stem: {row.get('Stem Length (mm)', 'N/A')}mm")
-            print(f"    Leaf: {row.get('Avg Leaf Width (mm)', 'N/A')}mm")
-            print(f"    Total Area: {row.get('Total Leaf Area (mm^2)', 'N/A')}mm^2")
-        
-        if len(all_data) > 5:
-            print(f"\n  ... and {len(all_data) - 5} more measurements")
-    else:
+    all_data = get_logger().get_all_data()
+    
+    if not all_data:
         print("\nNo data found or error occurred.")
+        return 1
+    
+    print(f"\nTotal rows: {len(all_data)}\n")
     
-    print("\n" + "="*60)
\ No newline at end of file
+    # Display first N rows
+    print(f"First {args.limit} measurements:")
+    for i, row in enumerate(all_data[:args.limit], 1):
+        print(f"\n  Measurement {i}:")
+        print(f"    Date: {row.get('Date', 'N/A')}")
+        print(f"    Stem: {row.get('Stem Length (mm)', 'N/A')}mm")
+        print(f"    Leaf: {row.get('Avg Leaf Width (mm)', 'N/A')}mm")
+        print(f"    Total Area: {row.get('Total Leaf Area (mm^2)', 'N/A')}mm^2")
+    
+    if len(all_data) > args.limit:
+        print(f"\n  ... and {len(all_data) - args.limit} more measurements")
+    return 0
+
+def main(argv=None):
+    """
+    Command line entry point: python google_sheets_logger.py <command>
+    """
+    parser = argparse.ArgumentParser(description="Spinach Monitor Google Sheets logger")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    subparsers.add_parser("test-connect", help="Check the credentials and sheet access").set_defaults(func=_cli_test_connect)
+    
+    log_parser = subparsers.add_parser("log", help="Log one row (test values by default)")
+    log_parser.add_argument("--stem", type=float, default=45.5, help="Stem length (mm)")
+    log_parser.add_argument("--leaf", type=float, default=12.3, help="Average leaf width (mm)")
+    log_parser.add_argument("--largest-leaf", type=float, default=15.8, help="Largest leaf width (mm)")
+    log_parser.add_argument("--count", type=int, default=6, help="Leaf count")
+    log_parser.add_argument("--image", default="test_image.jpg", help="Image filename")
+    log_parser.add_argument("--notes", default="Total area: 123.45mm^2 [Test]", help="Notes")
+    log_parser.set_defaults(func=_cli_log)
+    
+    subparsers.add_parser("latest", help="Show the most recent measurement").set_defaults(func=_cli_latest)
+    subparsers.add_parser("summary", help="Show growth statistics").set_defaults(func=_cli_summary)
+    
+    all_parser = subparsers.add_parser("all", help="Show the first rows of the sheet")
+    all_parser.add_argument("--limit", type=int, default=5, help="Number of rows to show")
+    all_parser.set_defaults(func=_cli_all)
+    
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+# Only run the CLI if this file is run directly (not imported)
+if __name__ == "__main__":
+    raise SystemExit(main())
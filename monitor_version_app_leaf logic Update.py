@@ -4,10 +4,22 @@ import tkinter as tk
 from tkinter import font
 from PIL import Image, ImageTk
 import gspread
+import requests
+from google.auth import exceptions as google_auth_exceptions
 from datetime import datetime
 import os
+import json
 import threading
 import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import NamedTuple
+
+try:
+    # On a Raspberry Pi, libcamera hands frames over directly instead of going through V4L2
+    from picamera2 import Picamera2
+except ImportError:
+    Picamera2 = None
 
 # --- 1. CONFIGURATION (Same as before) ---
 # ... (Configuration for REFERENCE_OBJECT, PLANT, etc. remains unchanged) ...
@@ -35,28 +47,110 @@ PLANT_UPPER_2 = np.array([0, 0, 0])      # Setting to 0,0,0 essentially disables
 # UPDATED: Increased to filter out more noise
 MIN_LEAF_AREA_PIXELS = 100 
 IMAGE_DIR = "captures" # Folder to save images when logging
+IMAGE_PREFIX = os.path.join(IMAGE_DIR, "plant_") # Built once; snapshot names are IMAGE_PREFIX + timestamp
+# The best-frame analysis runs for up to ANALYSIS_SECONDS, but stops early once
+# the best area hasn't improved for ANALYSIS_STALE_FRAMES new frames (after ANALYSIS_MIN_SECONDS)
+ANALYSIS_SECONDS = 2.0
+ANALYSIS_MIN_SECONDS = 0.5
+ANALYSIS_STALE_FRAMES = 8
+JPEG_QUALITY = 85      # Quality of the saved best-frame snapshots
+THUMB_MAX_EDGE = 1280  # Snapshots are downscaled so their longest side is at most this (pixels)
+# Once calibrated, the reference object is stationary, so only look for it every N frames
+REF_REDETECT_FRAMES = 30
+
+# Snapshot resizing runs through OpenCL (cv2.UMat) when the platform has it
+USE_OPENCL = cv2.ocl.haveOpenCL()
+
+# Opening kernel for the plant mask. A 7x7 rect is the same as 3 erode/dilate
+# iterations with OpenCV's default 3x3 kernel, but runs as a single pass.
+MORPH_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
 
 # --- 2. GOOGLE SHEETS LOGGER (Merged from google_sheets_logger.py) ---
 CREDENTIALS_FILE = 'credentials.json' 
 SHEET_NAME = 'Spinach Monitor' # Make sure this matches your sheet name!
+# Fast scheduled rows are buffered and sent in one append when this many are
+# waiting, or when the oldest has waited LOG_FLUSH_SECONDS
+LOG_BATCH_SIZE = 50
+LOG_FLUSH_SECONDS = 30
+# Rate-limit/server errors are retried with exponential backoff (or the server's Retry-After)
+LOG_RETRY_ATTEMPTS = 6
+LOG_RETRY_MAX_WAIT = 60
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Errors worth retrying: APIErrors are only raised for RETRY_STATUS_CODES (see log_data_batch)
+# (TransportError: the OAuth token couldn't be fetched or refreshed, e.g. no network)
+TRANSIENT_ERRORS = (
+    gspread.exceptions.APIError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    google_auth_exceptions.TransportError,
+)
+# Rows kept for the next flush while Sheets is unreachable (an hour of "Every Second");
+# beyond this the oldest are dropped
+MAX_PENDING_ROWS = 3600
+SCHEDULE_INTERVALS = {
+    "Every Second": 1,
+    "Every Minute": 60,
+    "Every Hour": 3600,
+    "Every Day": 86400
+}
+# Intervals too short for the best-frame analysis: these log the live metrics
+# instead, buffered and sent every LOG_FLUSH_SECONDS with one snapshot per batch
+FAST_INTERVALS = {1, 60}
+# Set to the ID of a Drive folder the service account can write to (e.g. in a
+# shared drive) to upload snapshots there and log their Drive link instead of
+# the local filename. None keeps snapshots in IMAGE_DIR only.
+DRIVE_FOLDER_ID = None
+DRIVE_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files"
+DRIVE_UPLOAD_TIMEOUT = 60 # Seconds before a stalled upload is given up (the snapshot is then saved locally)
+# How long closing the app waits for in-flight Sheets uploads and snapshot saves
+SHUTDOWN_TIMEOUT = 5
+
+# The worksheet is opened once and reused, so every append goes through the
+# same authorized session and its kept-alive HTTPS connection
+_worksheet = None
+_worksheet_lock = threading.Lock()
+
+def get_worksheet():
+    """
+    Returns the log worksheet, authenticating (and adding the header row to
+    a new sheet) only on first use or after forget_worksheet().
+    """
+    global _worksheet
+    with _worksheet_lock:
+        if _worksheet is None:
+            gc = gspread.service_account(filename=CREDENTIALS_FILE)
+            sh = gc.open(SHEET_NAME).sheet1
+
+            if sh.get('A1').first() is None:
+                print("Adding header row to new sheet.")
+                sh.append_row(["Timestamp", "Stem Height (mm)", "Leaf Count", "Total Leaf Area (mm²)", "Image Filename"])
+            _worksheet = sh
+        return _worksheet
+
+def forget_worksheet():
+    """Drops the cached worksheet so the next call reconnects from scratch."""
+    global _worksheet
+    with _worksheet_lock:
+        _worksheet = None
+
+def make_row(stem_mm, leaf_count, area_mm2, image_filename):
+    """
+    Builds a sheet row for one measurement, timestamped now.
+    """
+    timestamp = datetime.now().isoformat()
+    return [timestamp, round(stem_mm, 2), leaf_count, round(area_mm2, 2), image_filename]
 
-def log_data(stem_mm, leaf_count, area_mm2, image_filename):
+def log_data_batch(rows):
     """
-    Logs the measured data to a Google Sheet in a separate thread.
+    Logs a list of rows (see make_row) to the Google Sheet in one append call.
+    Runs on the logging worker thread.
+    Returns: True if the rows were logged, False if they were rejected (retrying won't help)
+    Raises: One of TRANSIENT_ERRORS for rate limits, server errors and connection problems
     """
-    print(f"Logging data: {stem_mm}mm, {leaf_count} leaves, {area_mm2}mm^2, {image_filename}")
+    print(f"Logging {len(rows)} row(s), latest: {rows[-1]}")
     try:
-        gc = gspread.service_account(filename=CREDENTIALS_FILE)
-        sh = gc.open(SHEET_NAME).sheet1
-        
-        timestamp = datetime.now().isoformat()
-        new_row = [timestamp, round(stem_mm, 2), leaf_count, round(area_mm2, 2), image_filename]
-        
-        if sh.get('A1').first() is None:
-            print("Adding header row to new sheet.")
-            sh.append_row(["Timestamp", "Stem Height (mm)", "Leaf Count", "Total Leaf Area (mm²)", "Image Filename"])
-
-        sh.append_row(new_row)
+        sh = get_worksheet()
+        sh.append_rows(rows)
         print("Successfully logged data to Google Sheet.")
         return True
         
@@ -64,29 +158,195 @@ def log_data(stem_mm, leaf_count, area_mm2, image_filename):
         print(f"Error: Spreadsheet '{SHEET_NAME}' not found.")
         print("Please create it and share it with the service account email.")
         return False
+    except gspread.exceptions.APIError as e:
+        if e.response.status_code in RETRY_STATUS_CODES:
+            raise # Transient, let the caller retry
+        print(f"Google Sheets API error: {e}")
+        forget_worksheet()
+        return False
     except FileNotFoundError:
         print(f"Error: Credentials file '{CREDENTIALS_FILE}' not found.")
         return False
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, google_auth_exceptions.TransportError):
+        raise # Network trouble (including fetching the OAuth token), let the caller retry
     except Exception as e:
         print(f"An error occurred during Google Sheets logging: {e}")
+        forget_worksheet() # e.g. revoked credentials
+        return False
+
+def encode_jpeg(frame):
+    """
+    Encodes a frame to JPEG in memory, downscaling it first if it is larger
+    than THUMB_MAX_EDGE.
+    Returns: The encoded bytes as a numpy array, or None if encoding failed
+    """
+    h, w = frame.shape[:2]
+    scale = min(1.0, THUMB_MAX_EDGE / max(h, w))
+    if scale < 1.0:
+        src = cv2.UMat(frame) if USE_OPENCL else frame
+        frame = cv2.resize(src, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+    ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+    return encoded if ok else None
+
+def upload_jpeg(name, encoded):
+    """
+    Uploads an encoded JPEG to DRIVE_FOLDER_ID in a single multipart request,
+    reusing the authorized session of the Sheets client.
+    Returns: The file's webViewLink, or None if the upload failed
+    """
+    try:
+        client = get_worksheet().client
+        # gspread 6 keeps the session on http_client, older versions on the client
+        session = getattr(client, "http_client", client).session
+        metadata = {"name": name, "parents": [DRIVE_FOLDER_ID]}
+        response = session.post(
+            DRIVE_UPLOAD_URL,
+            params={"uploadType": "multipart", "fields": "id,webViewLink", "supportsAllDrives": "true"},
+            files={
+                "metadata": (None, json.dumps(metadata), "application/json; charset=UTF-8"),
+                "file": (name, encoded.tobytes(), "image/jpeg"),
+            },
+            timeout=DRIVE_UPLOAD_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()["webViewLink"]
+    except Exception as e:
+        print(f"Error: Could not upload image {name} to Drive: {e}")
+        return None
+
+def save_jpeg(filename, frame, dir_fd=None):
+    """
+    Encodes a frame to JPEG in memory and writes it with one buffered write.
+    Frames larger than THUMB_MAX_EDGE are downscaled first.
+    If dir_fd (an open descriptor for IMAGE_DIR) is given, the file is created
+    relative to it so the directory path isn't resolved again on every save.
+    Returns: True if the file was written
+    """
+    try:
+        encoded = encode_jpeg(frame)
+        if encoded is None:
+            print(f"Error: Could not encode image {filename}")
+            return False
+        if dir_fd is not None:
+            fd = os.open(os.path.basename(filename), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+            with open(fd, 'wb', buffering=1024 * 1024) as f:
+                f.write(encoded)
+        else:
+            with open(filename, 'wb', buffering=1024 * 1024) as f:
+                f.write(encoded)
+        return True
+    except (OSError, cv2.error) as e:
+        print(f"Error: Could not save image {filename}: {e}")
         return False
 
+def retry_delay(error, attempt):
+    """
+    Seconds to wait before retrying a failed Sheets call: the server's
+    Retry-After header if it sent one, otherwise 2**attempt.
+    """
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    try:
+        wait = float(retry_after) if retry_after else 2 ** attempt
+    except ValueError:
+        wait = 2 ** attempt
+    return min(wait, LOG_RETRY_MAX_WAIT)
+
+def log_data_batch_with_retry(rows, stop_event=None):
+    """
+    Calls log_data_batch, retrying rate-limit, server and connection errors
+    with backoff. If stop_event is set while waiting to retry, gives up immediately.
+    Returns: What log_data_batch returned
+    Raises: The last transient error if the retries ran out (or stop_event was set)
+    """
+    for attempt in range(LOG_RETRY_ATTEMPTS):
+        try:
+            return log_data_batch(rows)
+        except TRANSIENT_ERRORS as e:
+            if attempt == LOG_RETRY_ATTEMPTS - 1:
+                print(f"Google Sheets unavailable, giving up after {LOG_RETRY_ATTEMPTS} attempts: {e}")
+                raise
+            delay = retry_delay(e, attempt)
+            print(f"Google Sheets call failed ({e}), retrying in {delay:.0f}s...")
+            if stop_event is not None:
+                if stop_event.wait(timeout=delay):
+                    print("Shutting down, not retrying.")
+                    raise
+            else:
+                time.sleep(delay)
+
+# --- CAMERA ---
+
+class PiCameraCapture:
+    """
+    Minimal cv2.VideoCapture-style wrapper (grab/retrieve/release) around
+    Picamera2, so video_loop works the same with either camera.
+    """
+    def __init__(self):
+        self.picam2 = Picamera2()
+        # RGB888 is stored B, G, R in memory, i.e. the layout OpenCV expects
+        self.picam2.configure(self.picam2.create_video_configuration(main={"format": "RGB888", "size": (640, 480)}))
+        self.picam2.start()
+        self.frame = None
+
+    def grab(self):
+        try:
+            self.frame = self.picam2.capture_array("main")
+        except RuntimeError as e:
+            print(f"Picamera2 capture failed: {e}")
+            self.frame = None
+        return self.frame is not None
+
+    def retrieve(self):
+        return self.frame is not None, self.frame
+
+    def release(self):
+        self.picam2.stop()
+        self.picam2.close()
+
+def open_camera():
+    """
+    Opens the Pi camera through Picamera2 if it is installed and a camera is
+    attached, otherwise the first webcam through OpenCV.
+    """
+    if Picamera2 is not None:
+        try:
+            return PiCameraCapture()
+        except (RuntimeError, IndexError) as e:
+            print(f"Picamera2 unavailable ({e}), falling back to OpenCV capture.")
+    return cv2.VideoCapture(0)
+
 # --- 3. COMPUTER VISION FUNCTIONS (Merged from live_plant_analysis.py) ---
 
-def find_pixels_per_mm(frame):
+def find_reference_box(hsv):
     """
-    Finds the blue reference object and calculates the px/mm ratio.
-    Returns: The frame with the ref box drawn, and the px/mm ratio (or 0 if not found)
+    Finds the blue reference object in an HSV frame.
+    Returns: Its bounding box (x, y, w, h), or None if not found
     """
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
     mask = cv2.inRange(hsv, REFERENCE_LOWER, REFERENCE_UPPER)
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     
     if not contours:
-        return frame, 0 # Return 0 if no ref object found
+        return None
     
     ref_contour = max(contours, key=cv2.contourArea)
-    x, y, w, h = cv2.boundingRect(ref_contour)
+    return cv2.boundingRect(ref_contour)
+
+def find_pixels_per_mm(frame, hsv=None):
+    """
+    Finds the blue reference object and calculates the px/mm ratio.
+    Pass hsv if the frame has already been converted, to avoid doing it twice.
+    Returns: The frame with the ref box drawn, and the px/mm ratio (or 0 if not found)
+    """
+    if hsv is None:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    ref_box = find_reference_box(hsv)
+    
+    if ref_box is None:
+        return frame, 0 # Return 0 if no ref object found
+    
+    x, y, w, h = ref_box
     width_in_pixels = w
     
     cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2) # Blue box
@@ -98,28 +358,50 @@ def find_pixels_per_mm(frame):
     pixels_per_mm = width_in_pixels / REFERENCE_WIDTH_MM
     return frame, pixels_per_mm
 
-def find_plant_contours(frame):
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+def find_plant_contours(frame, hsv=None, mask_buf=None):
+    """
+    Finds the leaf contours in a frame.
+    Pass hsv if the frame has already been converted, and mask_buf (a uint8
+    array of the frame's height x width) to reuse it for the mask.
+    Returns: The leaf contours, and their total area in pixels
+    """
+    if hsv is None:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
     
     # Use the new, more specific plant color range
-    mask1 = cv2.inRange(hsv, PLANT_LOWER_1, PLANT_UPPER_1)
+    mask1 = cv2.inRange(hsv, PLANT_LOWER_1, PLANT_UPPER_1, dst=mask_buf)
     
     # Only use mask2 if its bounds are not 0 (i.e., if it's explicitly defined)
     if not np.all(PLANT_LOWER_2 == 0) and not np.all(PLANT_UPPER_2 == 0):
         mask2 = cv2.inRange(hsv, PLANT_LOWER_2, PLANT_UPPER_2)
-        mask = cv2.bitwise_or(mask1, mask2)
+        mask = cv2.bitwise_or(mask1, mask2, dst=mask1)
     else:
         mask = mask1 # Only use the first mask
 
-    # More aggressive erosion to remove thin stems/noise
-    mask = cv2.erode(mask, None, iterations=3)
-    mask = cv2.dilate(mask, None, iterations=3)
+    # More aggressive erosion to remove thin stems/noise (erode + dilate in one opening)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, MORPH_KERNEL, dst=mask)
     
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     
-    # Filter out tiny noise contours
-    valid_contours = [c for c in contours if cv2.contourArea(c) > MIN_LEAF_AREA_PIXELS]
-    return valid_contours
+    # Filter out tiny noise contours, keeping the areas we already computed
+    # so the caller doesn't have to measure every leaf again
+    valid_contours = []
+    total_area_pixels = 0.0
+    for c in contours:
+        area = cv2.contourArea(c)
+        if area > MIN_LEAF_AREA_PIXELS:
+            valid_contours.append(c)
+            total_area_pixels += area
+    return valid_contours, total_area_pixels
+
+class Metrics(NamedTuple):
+    """
+    Raw measurements for one frame. Immutable, so video_loop can publish a new
+    one with a single attribute store and readers never need to copy it.
+    """
+    height: float
+    count: int
+    area: float
 
 # --- 4. TKINTER APPLICATION CLASS ---
 
@@ -130,23 +412,74 @@ class PlantMonitorApp:
         self.window.config(bg="gray10")
 
         os.makedirs(IMAGE_DIR, exist_ok=True)
+        # Snapshots are created relative to this descriptor (where the OS supports it)
+        self.image_dir_fd = None
+        if os.open in os.supports_dir_fd:
+            self.image_dir_fd = os.open(IMAGE_DIR, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
 
         # --- Webcam and CV Variables ---
-        self.cap = cv2.VideoCapture(0)
+        self.cap = open_camera()
         self.current_frame_raw = None 
-        self.current_metrics = {"height": 0, "count": 0, "area": 0}
+        self.current_metrics = Metrics(0.0, 0, 0.0)
+        # Signalled by video_loop each time a new frame and its metrics are stored
+        self.frame_ready = threading.Condition()
+        self.frame_seq = 0
+        # Set while something (the best-frame logger) needs every frame decoded
+        self.frame_wanted = threading.Event()
+        # Set while a fast schedule is logging the live metrics, which must stay fresh too
+        self.live_sampling = threading.Event()
+        # Reusable frame buffer for the best-frame analysis (see analyze_and_queue)
+        self.spare_frame = None
 
         # --- NEW: Calibration Variables ---
         self.pixels_per_mm = 0
         self.calibrated = False
+        self.ref_box = None     # Last known reference object box, redrawn every frame
+        self.frame_index = 0
+        self.mask_buf = None    # Reused plant mask, allocated on the first frame
 
         # --- NEW: UI Smoothing Variables ---
-        self.measurement_history = [] 
         self.smoothing_window = 30  # Average over 30 frames (approx 1 sec)
+        # Ring buffer of (height, count, area) rows; hist_idx counts frames written
+        self.measurement_history = np.zeros((self.smoothing_window, 3), dtype=np.float32)
+        self.hist_idx = 0
 
         # --- Scheduler Variables ---
-        self.scheduler_stop_event = threading.Event()
-        self.scheduler_thread = None
+        # Scheduled logging runs as a coroutine on one event loop in a background
+        # thread; scheduler_future is its handle (cancel() stops it)
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.scheduler_future = None
+        # Clear while a scheduler coroutine may still run; set once its cleanup is done
+        self.scheduler_done = threading.Event()
+        self.scheduler_done.set()
+        # Set when the app is closing so background waits return immediately
+        self.shutdown_event = threading.Event()
+        self.closing = False
+        # Held while a log request is being analysed; overlapping requests are skipped
+        self.log_busy = threading.Lock()
+        self.dropped_logs = 0
+
+        # --- Logging workers ---
+        # A single long-lived worker talks to Sheets, so calls never overlap.
+        # Rows wait in pending_rows and the worker sends all of them in one
+        # append; flush_queued avoids submitting a second flush while one waits.
+        self.log_executor = ThreadPoolExecutor(max_workers=1)
+        self.pending_lock = threading.Lock()
+        self.pending_rows = []
+        self.flush_queued = False
+
+        # Encodes/saves snapshots alongside the Sheets upload
+        self.io_executor = ThreadPoolExecutor(max_workers=2)
+
+        # Runs best-frame analyses (LOG DATA button and slow schedules).
+        # Two workers, so an overlapping request reaches log_busy and is skipped
+        # instead of queueing behind the running one.
+        self.analysis_executor = ThreadPoolExecutor(max_workers=2)
+
+        # Futures from the executors that haven't finished, so closing can wait for them
+        self.inflight_lock = threading.Lock()
+        self.inflight = set()
 
         # --- UI Elements ---
         helv = font.Font(family="Helvetica", size=12, weight="bold")
@@ -172,7 +505,7 @@ class PlantMonitorApp:
         self.button_frame = tk.Frame(self.window, bg="gray10")
         self.button_frame.pack(fill="x", padx=10, pady=10)
 
-        self.btn_log = tk.Button(self.button_frame, text="LOG DATA", font=helv, bg="green", fg="white", command=self.log_data_thread)
+        self.btn_log = tk.Button(self.button_frame, text="LOG DATA", font=helv, bg="green", fg="white", command=self.start_log_thread)
         self.btn_log.pack(side="left", expand=True, padx=5, ipady=5)
         
         # --- NEW: Recalibrate Button ---
@@ -211,24 +544,40 @@ class PlantMonitorApp:
         """Flags the app to re-run calibration on the next video frame."""
         self.calibrated = False
         self.pixels_per_mm = 0
+        self.ref_box = None
         self.status_label.config(text="Status: Recalibrating...", fg="yellow")
         # Clear history as old mm values are now invalid
-        self.measurement_history = [] 
+        self.hist_idx = 0
 
     def video_loop(self):
-        ret, frame = self.cap.read()
+        # grab() only pulls the frame off the camera; decoding happens in retrieve()
+        if not self.cap.grab():
+            self.status_label.config(text="Error: Webcam feed lost.", fg="red")
+            self.window.after(100, self.video_loop) # Try again
+            return
+
+        # While minimised nobody sees the preview, so unless the logger is
+        # collecting frames or sampling live metrics, drop this one without decoding it
+        if self.window.state() == "iconic" and not (self.frame_wanted.is_set() or self.live_sampling.is_set()):
+            self.window.after(10, self.video_loop)
+            return
+
+        ret, frame = self.cap.retrieve()
         if not ret:
             self.status_label.config(text="Error: Webcam feed lost.", fg="red")
             self.window.after(100, self.video_loop) # Try again
             return
 
-        self.current_frame_raw = frame.copy() 
         frame_processed = frame.copy()
+        self.frame_index += 1
+
+        # Convert once per frame; shared by calibration and plant detection
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
 
         # --- A. UPDATED: Calibration Logic ---
         # Only run calibration if not already calibrated
         if not self.calibrated:
-            frame_processed, pixels_per_mm_found = find_pixels_per_mm(frame_processed)
+            frame_processed, pixels_per_mm_found = find_pixels_per_mm(frame_processed, hsv)
             if pixels_per_mm_found > 0:
                 self.pixels_per_mm = pixels_per_mm_found
                 self.calibrated = True
@@ -237,16 +586,15 @@ class PlantMonitorApp:
             else:
                 # Show error but keep trying
                 cv2.putText(frame_processed, "Cannot find BLUE reference object!", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                if not (self.scheduler_thread and self.scheduler_thread.is_alive()):
+                if not self.scheduler_running():
                     self.status_label.config(text="Status: Cannot find BLUE reference object.", fg="red")
         else:
-            # Already calibrated, just draw the ref box for confirmation
-            hsv = cv2.cvtColor(frame_processed, cv2.COLOR_BGR2HSV)
-            mask = cv2.inRange(hsv, REFERENCE_LOWER, REFERENCE_UPPER)
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            if contours:
-                ref_contour = max(contours, key=cv2.contourArea)
-                x, y, w, h = cv2.boundingRect(ref_contour)
+            # Already calibrated, just draw the ref box for confirmation.
+            # The object doesn't move, so re-detect it only every few frames.
+            if self.ref_box is None or self.frame_index % REF_REDETECT_FRAMES == 0:
+                self.ref_box = find_reference_box(hsv)
+            if self.ref_box is not None:
+                x, y, w, h = self.ref_box
                 cv2.rectangle(frame_processed, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
 
@@ -255,49 +603,57 @@ class PlantMonitorApp:
         
         # Only measure if calibration is successful
         if self.calibrated and self.pixels_per_mm > 0:
-            if not (self.scheduler_thread and self.scheduler_thread.is_alive()) and self.calibrated:
+            if not self.scheduler_running() and self.calibrated:
                 self.status_label.config(text="Status: Calibrated! Monitoring.", fg="green")
 
-            plant_contours = find_plant_contours(frame_processed)
+            if self.mask_buf is None or self.mask_buf.shape != frame.shape[:2]:
+                self.mask_buf = np.empty(frame.shape[:2], dtype=np.uint8)
+            plant_contours, total_leaf_area_pixels = find_plant_contours(frame_processed, hsv, self.mask_buf)
             
             if plant_contours:
                 leaf_count = len(plant_contours)
-                all_points = np.concatenate(plant_contours)
-                x_all, y_all, w_all, h_all = cv2.boundingRect(all_points)
+                # One bounding rect per leaf, reused for the yellow boxes below.
+                # The plant's box is their union, so the contour points don't
+                # need to be concatenated and measured again.
+                leaf_rects = [cv2.boundingRect(c) for c in plant_contours]
+                rects = np.array(leaf_rects)
+                x_all, y_all = int(rects[:, 0].min()), int(rects[:, 1].min())
+                w_all = int((rects[:, 0] + rects[:, 2]).max()) - x_all
+                h_all = int((rects[:, 1] + rects[:, 3]).max()) - y_all
                 cv2.rectangle(frame_processed, (x_all, y_all), (x_all + w_all, y_all + h_all), (0, 255, 0), 2) # Green box
                 
                 plant_height_mm = h_all / self.pixels_per_mm
                 
-                total_leaf_area_pixels = sum(cv2.contourArea(c) for c in plant_contours)
                 total_leaf_area_mm2 = total_leaf_area_pixels / (self.pixels_per_mm ** 2)
                 
                 # --- NEW: Individual Leaf Tracking (Yellow Boxes) ---
-                for i, c in enumerate(plant_contours):
-                    x, y, w, h = cv2.boundingRect(c)
+                for i, (x, y, w, h) in enumerate(leaf_rects):
                     # Draw individual YELLOW box
                     cv2.rectangle(frame_processed, (x, y), (x + w, y + h), (0, 255, 255), 2) # BGR for Yellow
                     label = f"L{i + 1}"
                     cv2.putText(frame_processed, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
                 # --- END NEW ---
 
-        # Store metrics for the log button (RAW values)
-        self.current_metrics = {
-            "height": plant_height_mm, 
-            "count": leaf_count, 
-            "area": total_leaf_area_mm2
-        }
+        # Publish the frame and its metrics (RAW values) together, so readers
+        # never pair one frame with another frame's measurements.
+        # Each retrieve() returns a new array and frame itself is never drawn on
+        # (only frame_processed is), so it can be shared without a copy.
+        # Then wake up anything waiting for a new frame (e.g. the best-frame logger)
+        with self.frame_ready:
+            self.current_frame_raw = frame
+            self.current_metrics = Metrics(plant_height_mm, leaf_count, total_leaf_area_mm2)
+            self.frame_seq += 1
+            self.frame_ready.notify_all()
         
         # --- NEW: Smoothing Logic ---
-        self.measurement_history.append(self.current_metrics)
-        if len(self.measurement_history) > self.smoothing_window:
-            self.measurement_history.pop(0) 
+        # Overwrite the oldest slot in the ring buffer (no per-frame allocation)
+        self.measurement_history[self.hist_idx % self.smoothing_window] = (plant_height_mm, leaf_count, total_leaf_area_mm2)
+        self.hist_idx += 1
             
-        if self.measurement_history:
-            avg_height = np.mean([m['height'] for m in self.measurement_history])
-            avg_count = np.mean([m['count'] for m in self.measurement_history])
-            avg_area = np.mean([m['area'] for m in self.measurement_history])
-        else:
-            avg_height, avg_count, avg_area = 0, 0, 0
+        # One column-wise mean over the filled part of the buffer gives all three
+        # averages in a single pass (hist_idx >= 1 here, so the slice is never empty)
+        filled = min(self.hist_idx, self.smoothing_window)
+        avg_height, avg_count, avg_area = self.measurement_history[:filled].mean(axis=0)
         
         # Update UI labels (with SMOOTHED values)
         self.lbl_height.config(text=f"Height: {avg_height:.2f} mm")
@@ -315,116 +671,343 @@ class PlantMonitorApp:
         self.window.after(10, self.video_loop)
 
     # --- UPDATED: 2-Second "Best Frame" Logger ---
+    def start_log_thread(self):
+        """LOG DATA button: runs the analysis on a worker thread so the UI and video keep running."""
+        if self.closing:
+            return
+        self.submit_background(self.analysis_executor, self.log_data_thread)
+
     def log_data_thread(self):
+        """
+        Finds the best frame over (up to) 2 seconds and logs it.
+        If the previous request is still being analysed this one is skipped
+        and counted in dropped_logs.
+        """
+        if not self.log_busy.acquire(blocking=False):
+            self.dropped_logs += 1
+            print(f"Log request skipped, previous one still running ({self.dropped_logs} skipped so far).")
+            self.window.after(0, self.status_label.config, {"text": f"Status: Busy, skipped log ({self.dropped_logs} skipped so far)", "fg": "orange"})
+            return
+        try:
+            self.analyze_and_queue()
+        finally:
+            self.log_busy.release()
+
+    def analyze_and_queue(self):
         if not self.calibrated:
-            self.status_label.config(text="Status: Please calibrate first!", fg="red")
+            self.window.after(0, self.status_label.config, {"text": "Status: Please calibrate first!", "fg": "red"})
             return
             
-        self.status_label.config(text="Status: Analyzing for 2 seconds...", fg="yellow")
+        self.window.after(0, self.status_label.config, {"text": "Status: Analyzing for up to 2 seconds...", "fg": "yellow"})
         
         start_time = time.time()
-        all_measurements = []
+        # Keep only the best frame so far instead of buffering every frame
+        best_metrics, best_frame, best_area = None, None, -1.0
+        # Frames are copied into reused buffers: a new best goes into the spare,
+        # and the previous best becomes the spare
+        spare = self.spare_frame
+        last_seq = None
+        stale = 0 # New frames since the best area last improved
 
         print("Starting 2-second analysis window...")
-        while time.time() - start_time < 2.0:
-            if self.current_frame_raw is not None:
-                # We copy to prevent issues from the other thread writing to them
-                current_metrics_copy = self.current_metrics.copy()
-                current_frame_copy = self.current_frame_raw.copy()
-                all_measurements.append((current_metrics_copy, current_frame_copy))
-            time.sleep(0.1) 
+        self.frame_wanted.set()
+        while True:
+            elapsed = time.time() - start_time
+            remaining = ANALYSIS_SECONDS - elapsed
+            if remaining <= 0:
+                break
+            # The scene has settled, no point waiting out the full window
+            if elapsed > ANALYSIS_MIN_SECONDS and stale >= ANALYSIS_STALE_FRAMES:
+                print(f"Best area stable for {stale} frames, ending analysis early.")
+                break
+
+            with self.frame_ready:
+                # Sleep until video_loop publishes a frame we haven't seen yet,
+                # so each frame is copied exactly once
+                if self.frame_seq == last_seq:
+                    self.frame_ready.wait(timeout=remaining)
+                    if self.frame_seq == last_seq:
+                        continue # Timed out without a new frame
+                last_seq = self.frame_seq
+                # Only take the references under the lock; video_loop never
+                # mutates a published frame, so copying can wait until after
+                raw, metrics = self.current_frame_raw, self.current_metrics
+
+            if raw is None:
+                continue
+
+            # The best measurement is the one with the highest total leaf area.
+            # Only copy the frame when it beats the running best.
+            # Metrics is immutable so a plain reference is enough.
+            if metrics.area > best_area:
+                if spare is None or spare.shape != raw.shape:
+                    spare = np.empty_like(raw)
+                np.copyto(spare, raw)
+                best_frame, spare = spare, best_frame
+                best_metrics = metrics
+                best_area = metrics.area
+                stale = 0
+            else:
+                stale += 1
+        self.frame_wanted.clear()
+        # best_frame is handed to the JPEG saver, so only the spare can be reused
+        self.spare_frame = spare
         
-        if not all_measurements:
-            self.status_label.config(text="Status: Analysis failed (no frames).", fg="red")
+        if best_frame is None:
+            self.window.after(0, self.status_label.config, {"text": "Status: Analysis failed (no frames).", "fg": "red"})
             return
 
-        # Find the best measurement based on highest total leaf area
-        best_measurement = max(all_measurements, key=lambda item: item[0]['area'])
-        
-        best_metrics = best_measurement[0]
-        best_frame = best_measurement[1]
-
-        print(f"Analysis complete. Best Area: {best_metrics['area']:.2f} mm^2")
-        self.status_label.config(text="Status: Analysis complete. Logging data...", fg="yellow")
+        print(f"Analysis complete. Best Area: {best_metrics.area:.2f} mm^2")
+        self.window.after(0, self.status_label.config, {"text": "Status: Analysis complete. Logging data...", "fg": "yellow"})
 
-        timestamp_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = os.path.join(IMAGE_DIR, f'plant_{timestamp_str}_best.jpg')
+        filename = f"{IMAGE_PREFIX}{time.strftime('%Y-%m-%d_%H-%M-%S')}_best.jpg"
         
-        cv2.imwrite(filename, best_frame)
-        
-        height = best_metrics["height"]
-        count = best_metrics["count"]
-        area = best_metrics["area"]
+        height, count, area = best_metrics
 
-        log_thread = threading.Thread(
-            target=self.log_to_sheets_and_update_status,
-            args=(height, count, area, filename)
-        )
-        log_thread.start()
+        self.queue_with_snapshot(filename, best_frame, make_row(height, count, area, filename))
     # --- END OF UPDATE ---
 
-    def log_to_sheets_and_update_status(self, height, count, area, filename):
-        success = log_data(height, count, area, filename)
-        
-        if success:
-            self.window.after(0, self.status_label.config, {"text": "Status: Logged successfully!", "fg": "green"})
+    def queue_sample(self, with_snapshot):
+        """
+        Fast-schedule tick: buffers a row from the live metrics, without the
+        best-frame window. With with_snapshot=True the current frame is saved
+        for the row and everything buffered is sent.
+        """
+        if not self.calibrated:
+            self.window.after(0, self.status_label.config, {"text": "Status: Please calibrate first!", "fg": "red"})
+            return
+
+        # Metrics is immutable and each frame is a new array, so no copies are needed
+        with self.frame_ready:
+            frame, (height, count, area) = self.current_frame_raw, self.current_metrics
+        if with_snapshot and frame is not None:
+            filename = f"{IMAGE_PREFIX}{time.strftime('%Y-%m-%d_%H-%M-%S')}.jpg"
+            self.queue_with_snapshot(filename, frame, make_row(height, count, area, filename))
+            return
+
+        with self.pending_lock:
+            self.pending_rows.append(make_row(height, count, area, ""))
+            flush_now = len(self.pending_rows) >= LOG_BATCH_SIZE
+
+        if flush_now:
+            self.request_flush()
+
+    def queue_with_snapshot(self, filename, frame, row):
+        """
+        Queues a row whose snapshot is stored in the background, and asks for
+        a flush. Saved locally, the snapshot is written while the row is
+        already on its way; uploaded to Drive, the row has to wait for the
+        link (see upload_snapshot).
+        """
+        if DRIVE_FOLDER_ID:
+            self.submit_background(self.io_executor, self.upload_snapshot, filename, frame, row)
+            return
+
+        self.submit_background(self.io_executor, save_jpeg, filename, frame, self.image_dir_fd)
+        with self.pending_lock:
+            self.pending_rows.append(row)
+        self.request_flush()
+
+    def upload_snapshot(self, filename, frame, row):
+        """
+        Runs on the io worker. Uploads the snapshot to Drive and puts the link
+        in the row; if that fails it is saved to IMAGE_DIR instead. The row is
+        queued and flushed whatever happens to the snapshot.
+        """
+        try:
+            link = None
+            encoded = encode_jpeg(frame)
+            if encoded is not None:
+                link = upload_jpeg(os.path.basename(filename), encoded)
+            if link:
+                row[-1] = link
+            elif not save_jpeg(filename, frame, self.image_dir_fd):
+                row[-1] = "" # No snapshot to point to
+        except Exception as e:
+            print(f"Error: Could not store image {filename}: {e}")
+            row[-1] = ""
+
+        with self.pending_lock:
+            self.pending_rows.append(row)
+        self.request_flush()
+
+    def submit_background(self, executor, fn, *args):
+        """Submits work to an executor and tracks it until it finishes."""
+        future = executor.submit(fn, *args)
+        with self.inflight_lock:
+            self.inflight.add(future)
+        future.add_done_callback(self._background_done)
+        return future
+
+    def _background_done(self, future):
+        with self.inflight_lock:
+            self.inflight.discard(future)
+
+    def drain_background_work(self, timeout):
+        """
+        Waits up to timeout seconds for tracked background work, and for a
+        stopped scheduler's cleanup, to finish. Tk events keep being processed
+        meanwhile, since workers post status updates through window.after.
+        Returns: The number of tasks still unfinished
+        """
+        deadline = time.time() + timeout
+        while True:
+            # Checked before inflight: the scheduler's final flush is tracked
+            # there before scheduler_done is set
+            scheduler_busy = not self.scheduler_done.is_set()
+            with self.inflight_lock:
+                pending = list(self.inflight)
+            if not (pending or scheduler_busy) or time.time() >= deadline:
+                return len(pending) + scheduler_busy
+            self.window.update()
+            if pending:
+                wait(pending, timeout=0.05)
+            else:
+                self.scheduler_done.wait(timeout=0.05)
+
+    def request_flush(self):
+        """Asks the log worker to send all pending rows, unless a flush is already waiting."""
+        with self.pending_lock:
+            if self.flush_queued or not self.pending_rows:
+                return
+            self.flush_queued = True
+        self.submit_background(self.log_executor, self.log_to_sheets_and_update_status)
+
+    def log_to_sheets_and_update_status(self):
+        # Runs on the log worker: take every row queued so far
+        with self.pending_lock:
+            rows, self.pending_rows = self.pending_rows, []
+            self.flush_queued = False
+        if not rows:
+            return
+
+        try:
+            success = log_data_batch_with_retry(rows, self.shutdown_event)
+        except TRANSIENT_ERRORS:
+            # Sheets is unreachable for now: keep the rows (in order) for the
+            # next flush, dropping the oldest beyond MAX_PENDING_ROWS
+            with self.pending_lock:
+                self.pending_rows[:0] = rows
+                overflow = len(self.pending_rows) - MAX_PENDING_ROWS
+                if overflow > 0:
+                    del self.pending_rows[:overflow]
+                kept = len(self.pending_rows)
+            if overflow > 0:
+                print(f"Too many unsent rows, dropped the {overflow} oldest.")
+            self.window.after(0, self.status_label.config, {"text": f"Status: Sheets unreachable, {kept} row(s) waiting. Check terminal.", "fg": "orange"})
         else:
-            self.window.after(0, self.status_label.config, {"text": "Status: Logging FAILED. Check terminal.", "fg": "red"})
+            if success:
+                self.window.after(0, self.status_label.config, {"text": f"Status: Logged {len(rows)} row(s) successfully!", "fg": "green"})
+            else:
+                # Rejected by Sheets or misconfigured: resending won't help, so drop them
+                print(f"Dropped {len(rows)} row(s) that could not be logged.")
+                self.window.after(0, self.status_label.config, {"text": "Status: Logging FAILED. Check terminal.", "fg": "red"})
 
-        time.sleep(3)
-        if not (self.scheduler_thread and self.scheduler_thread.is_alive()) and self.calibrated:
-             self.window.after(0, self.status_label.config, {"text": "Status: Calibrated! Monitoring.", "fg": "green"})
+        # Show the result for 3 seconds. The reset is a Tk timer, so this
+        # worker is free for the next flush straight away.
+        self.window.after(3000, self.reset_status)
+
+    def reset_status(self):
+        """Puts the idle status back after a log result has been shown (runs on Tk)."""
+        if self.closing:
+            return
+        if not self.scheduler_running() and self.calibrated:
+            self.status_label.config(text="Status: Calibrated! Monitoring.", fg="green")
 
     # --- SCHEDULER FUNCTIONS ---
+    def scheduler_running(self):
+        return self.scheduler_future is not None and not self.scheduler_future.done()
+
     def toggle_scheduler(self):
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
-            self.scheduler_stop_event.set()
+        if self.scheduler_running():
+            # Cancellation is delivered at the coroutine's next await, no polling needed
+            self.scheduler_future.cancel()
             self.btn_schedule_toggle.config(text="Start Schedule", bg="gray50")
             self.status_label.config(text="Status: Scheduler stopping...", fg="yellow")
         else:
             if not self.calibrated:
                 self.status_label.config(text="Status: Please calibrate first!", fg="red")
                 return
-            
-            self.scheduler_stop_event.clear()
-            self.btn_schedule_toggle.config(text="Stop Schedule", bg="orange")
-            
-            self.scheduler_thread = threading.Thread(target=self.scheduler_loop, daemon=True)
-            self.scheduler_thread.start()
-
-    def scheduler_loop(self):
-        selected_option = self.schedule_var.get()
-        
-        interval_map = {
-            "Every Second": 1,
-            "Every Minute": 60,
-            "Every Hour": 3600,
-            "Every Day": 86400
-        }
-        interval_seconds = interval_map.get(selected_option)
-
-        if not interval_seconds:
-            self.window.after(0, self.status_label.config, {"text": "Status: Scheduler Off.", "fg": "gray80"})
-            self.window.after(0, self.btn_schedule_toggle.config, {"text": "Start Schedule", "bg": "gray50"})
-            return
 
-        self.window.after(0, self.status_label.config, {"text": f"Status: Auto-logging {selected_option}", "fg": "cyan"})
-
-        while not self.scheduler_stop_event.is_set():
-            print(f"Scheduler: Triggering log for {selected_option}")
-            self.log_data_thread()
-            stopped = self.scheduler_stop_event.wait(timeout=interval_seconds)
-            if stopped:
-                break 
+            selected_option = self.schedule_var.get()
+            interval_seconds = SCHEDULE_INTERVALS.get(selected_option)
+            if not interval_seconds:
+                self.status_label.config(text="Status: Scheduler Off.", fg="gray80")
+                return
 
-        print("Scheduler loop finished.")
-        self.window.after(0, self.status_label.config, {"text": "Status: Scheduler Off.", "fg": "gray80"})
-        self.window.after(0, self.btn_schedule_toggle.config, {"text": "Start Schedule", "bg": "gray50"})
+            self.btn_schedule_toggle.config(text="Stop Schedule", bg="orange")
+            self.scheduler_done.clear()
+            self.scheduler_future = asyncio.run_coroutine_threadsafe(
+                self.scheduler_coro(selected_option, interval_seconds), self.loop)
+
+    async def scheduler_coro(self, selected_option, interval_seconds):
+        """
+        Runs on the scheduler event loop. Fast intervals sample the live metrics
+        on the loop itself; slower ones run the blocking best-frame analysis on
+        the analysis executor. The waits between runs are loop timers.
+        """
+        fast = interval_seconds in FAST_INTERVALS
+        last_flush = 0.0 # The first sample is sent right away
+
+        try:
+            self.window.after(0, self.status_label.config, {"text": f"Status: Auto-logging {selected_option}", "fg": "cyan"})
+            if fast:
+                # Keep video_loop measuring every frame even while the window is minimised
+                self.live_sampling.set()
+            while True:
+                if fast:
+                    # The sample that closes a batch carries its snapshot
+                    flush_due = time.time() - last_flush >= LOG_FLUSH_SECONDS
+                    self.queue_sample(flush_due)
+                    if flush_due:
+                        last_flush = time.time()
+                else:
+                    print(f"Scheduler: Triggering log for {selected_option}")
+                    # Tracked like the other background work, so closing waits for it.
+                    # Shielded so stopping the schedule doesn't abandon a half-done
+                    # analysis; it queues and flushes its own row when it finishes.
+                    job = self.submit_background(self.analysis_executor, self.log_data_thread)
+                    await asyncio.shield(asyncio.wrap_future(job))
+                await asyncio.sleep(interval_seconds)
+        finally:
+            self.live_sampling.clear()
+            # Send whatever is still buffered. When closing, on_closing waits
+            # for this (scheduler_done) before shutting the executors down.
+            self.request_flush()
+            print("Scheduler loop finished.")
+            if not self.shutdown_event.is_set():
+                self.window.after(0, self.status_label.config, {"text": "Status: Scheduler Off.", "fg": "gray80"})
+                self.window.after(0, self.btn_schedule_toggle.config, {"text": "Start Schedule", "bg": "gray50"})
+            self.scheduler_done.set()
 
 
     def on_closing(self):
+        # The drain below keeps processing Tk events, so a second QUIT click
+        # or window close must not start another shutdown
+        if self.closing:
+            return
+        self.closing = True
+        for button in (self.btn_log, self.btn_recal, self.btn_quit, self.btn_schedule_toggle):
+            button.config(state="disabled")
+
         print("Closing application...")
-        self.scheduler_stop_event.set()
+        self.shutdown_event.set()
+        if self.scheduler_running():
+            self.scheduler_future.cancel()
+
+        # Send any buffered rows and let in-flight uploads/snapshots finish (bounded)
+        self.request_flush()
+        unfinished = self.drain_background_work(SHUTDOWN_TIMEOUT)
+        if unfinished:
+            print(f"Shutdown: {unfinished} background task(s) did not finish in {SHUTDOWN_TIMEOUT}s.")
+        self.log_executor.shutdown(wait=False, cancel_futures=True)
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+        self.analysis_executor.shutdown(wait=False, cancel_futures=True)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        # A save that is still running may need the descriptor; the process is exiting anyway
+        if self.image_dir_fd is not None and not unfinished:
+            os.close(self.image_dir_fd)
+
         self.cap.release()
         self.window.destroy()
 